@@ -1,47 +1,16 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import numpy as np
-from chat_analysis import format_data_for_prompt, analyze_with_chatgpt
-
-@st.cache_data
-def load_returns_data():
-    """Load and cache returns data"""
-    try:
-        returns = pd.read_excel('returns.xlsx', index_col='DATE')
-        msci = pd.read_excel('msci_wrld.xlsx')
-        rbics = pd.read_excel('rbics.xlsx')
-        # Add fundamentals data loading
-        fundamentals = {
-            'capex': pd.read_excel('fundamentals/capex.xlsx', index_col='DATE'),
-            'revenue': pd.read_excel('fundamentals/revenue.xlsx', index_col='DATE'),
-            'ebitda': pd.read_excel('fundamentals/ebitda.xlsx', index_col='DATE'),
-            # Add more fundamental items as needed
-        }
-        return returns, msci, rbics, fundamentals
-    except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        return None, None, None, None
+import time
+STARTUP_START = time.perf_counter()
 
-# Load data using cache
-RETURNS, MSCIWRLD, RBICS_DF, FUNDAMENTALS = load_returns_data()
-if RETURNS is not None and MSCIWRLD is not None and RBICS_DF is not None and FUNDAMENTALS is not None:
-    st.success("Data loaded successfully!")
+import streamlit as st
+from startup import StartupTimer, load_snapshot, save_snapshot
 
-# Set page config
+# Set page config first so the page shell renders before anything heavy runs
 st.set_page_config(
     page_title="Company Score Analysis",
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
-# Custom color schemes
-CUSTOM_COLORS = {
-    'sector': px.colors.qualitative.Set3,
-    'country': px.colors.qualitative.Pastel,
-    'mcap': px.colors.qualitative.Safe
-}
-
 # Custom styling
 st.markdown("""
     <style>
@@ -63,6 +32,86 @@ st.markdown("""
     </h1>
     """, unsafe_allow_html=True)
 
+startup = StartupTimer(STARTUP_START)
+startup.mark('page shell')
+startup_container = st.container()
+
+# Modules only needed by the ChatGPT and risk sections (chat_analysis,
+# job_queue, risk) are imported when those sections first run
+with st.spinner("Loading dashboard..."):
+    import pandas as pd
+    import numpy as np
+    import plotly.express as px
+    from company_search import CompanySearchIndex
+    from composition import CompositionEngine
+    from data_loader import REFERENCE_WORKBOOKS, FUNDAMENTAL_ITEMS
+    from ingestion import ReferenceData, file_signature
+    from portfolio_aggregation import aggregate_panel, basket_weights, market_cap_columns
+    from paginated_table import paginated_table, score_order
+startup.mark('imports')
+
+INPUT_FILE = 'input.xlsx'
+
+COMPOSITION_DIMENSIONS = ['gics_1_sector', 'country', 'Market cap group',
+                          'Most_aligned_rev_name', 'Least_aligned_rev_name']
+
+def build_app_state(input_file):
+    """Preprocess the input file from scratch"""
+    df = pd.read_excel(input_file)
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    return {
+        'df': df,
+        'numeric_cols': numeric_cols,
+        'norm_stats': df[numeric_cols].agg(['min', 'max']),
+        'composition': CompositionEngine(df, COMPOSITION_DIMENSIONS),
+        'search_index': CompanySearchIndex(df),
+    }
+
+@st.cache_resource(max_entries=1)
+def get_app_state(input_signature):
+    """Preprocessed state for one version of the input file, restored from the snapshot when possible"""
+    state = load_snapshot(input_signature)
+    restored = state is not None
+    if not restored:
+        state = build_app_state(INPUT_FILE)
+    # 'dirty' marks state that differs from the snapshot on disk
+    return state, {'restored': restored, 'dirty': not restored}
+
+@st.cache_resource
+def get_reference_data():
+    """Reference workbooks shared by all sessions; warm-started from the panel store"""
+    return ReferenceData(REFERENCE_WORKBOOKS)
+
+@st.cache_resource
+def get_job_queue():
+    """Background worker pool shared by all sessions"""
+    from job_queue import JobQueue
+    return JobQueue('jobs.sqlite', max_workers=2)
+
+@st.cache_resource(max_entries=1)
+def get_risk_engine(universe_ids, panel_version, benchmark_version, _returns, _benchmark):
+    """Risk engine for the screened universe; rebuilt when the returns panel or the benchmark changes"""
+    from risk import RiskEngine
+    return RiskEngine(_returns, _benchmark, universe=list(universe_ids))
+
+def load_returns_data(reference):
+    """Load returns data, ingesting only dates and IDs added since the last run"""
+    try:
+        changes = reference.refresh()
+        fundamentals = {item: reference.frames[item] for item in FUNDAMENTAL_ITEMS}
+        return (reference.frames['returns'], reference.frames['msci'], reference.frames['rbics'],
+                fundamentals, reference.load_report, changes)
+    except Exception as e:
+        st.error(f"Error loading data: {str(e)}")
+        return None, None, None, None, None, {}
+
+# Custom color schemes
+CUSTOM_COLORS = {
+    'sector': px.colors.qualitative.Set3,
+    'country': px.colors.qualitative.Pastel,
+    'mcap': px.colors.qualitative.Safe
+}
+
 # File upload
 # uploaded_file = st.file_uploader("Upload Excel file", type=['xlsx'])
 # 
@@ -75,13 +124,37 @@ st.markdown("""
 #         st.error(f"Error loading file: {str(e)}")
 #         st.stop()
 
-# Direct file reading
+# Direct file reading, restored from the snapshot when the file is unchanged
 try:
-    df = pd.read_excel('input.xlsx')
+    input_signature = file_signature(INPUT_FILE)
+    APP_STATE, SNAPSHOT_STATUS = get_app_state(input_signature)
     st.success("File successfully loaded!")
 except Exception as e:
     st.error(f"Error loading file: {str(e)}")
     st.stop()
+startup.mark('input state (snapshot)' if SNAPSHOT_STATUS['restored'] else 'input state (built)')
+
+# Load reference data
+REFERENCE = get_reference_data()
+RETURNS, MSCIWRLD, RBICS_DF, FUNDAMENTALS, LOAD_TIMINGS, REFERENCE_CHANGES = load_returns_data(REFERENCE)
+if RETURNS is not None and MSCIWRLD is not None and RBICS_DF is not None and FUNDAMENTALS is not None:
+    st.success("Data loaded successfully!")
+startup.mark('reference data')
+
+if SNAPSHOT_STATUS['dirty']:
+    try:
+        save_snapshot(input_signature, APP_STATE)
+        SNAPSHOT_STATUS['dirty'] = False
+        startup.mark('snapshot saved')
+    except Exception as e:
+        st.warning(f"Could not save startup snapshot: {str(e)}")
+
+# The cached frame is shared between reruns; columns added below stay local to this run
+df = APP_STATE['df'].copy(deep=False)
+numeric_cols = APP_STATE['numeric_cols']
+norm_stats = APP_STATE['norm_stats']
+composition = APP_STATE['composition']
+search_index = APP_STATE['search_index']
 
 # Create two columns for the layout
 col1, col2 = st.columns([2, 1])
@@ -90,7 +163,6 @@ with col1:
     st.subheader("Score Analysis")
     
     # Criteria selection - modified to allow any numeric columns
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     if not numeric_cols:
         st.error("No numeric columns found in the file!")
         st.stop()
@@ -136,9 +208,11 @@ if selected_criteria and weights:
     weighted_scores = pd.Series(0.0, index=df.index)
     
     for criterion in selected_criteria:
-        if df[criterion].max() - df[criterion].min() != 0:
-            normalized_scores = (df[criterion] - df[criterion].min()) / (
-                df[criterion].max() - df[criterion].min()
+        criterion_min = norm_stats.at['min', criterion]
+        criterion_max = norm_stats.at['max', criterion]
+        if criterion_max - criterion_min != 0:
+            normalized_scores = (df[criterion] - criterion_min) / (
+                criterion_max - criterion_min
             )
             weighted_scores += normalized_scores * (weights[criterion] / total_weight)
     
@@ -150,7 +224,14 @@ if selected_criteria and weights:
     
     # Calculate threshold and filter companies
     threshold = df['Composite_Score'].quantile(percentile_threshold / 100)
-    df_filtered = df[df['Composite_Score'] >= threshold].copy()
+    basket_mask = (df['Composite_Score'] >= threshold).to_numpy()
+    df_filtered = df[basket_mask].copy()
+    basket_composition = composition.breakdown(basket_mask)
+
+    def basket_counts(dim):
+        """Non-zero basket counts of one dimension, largest first, from the breakdown pass"""
+        counts = basket_composition[dim]['count']
+        return counts[counts > 0]
     
     # Display metrics
     metric_col1, metric_col2, metric_col3 = st.columns(3)
@@ -190,7 +271,7 @@ if selected_criteria and weights:
     with viz_col2:
         # Sector composition
         if 'gics_1_sector' in df.columns:
-            sector_counts = df_filtered['gics_1_sector'].value_counts()
+            sector_counts = basket_counts('gics_1_sector')
             fig_sector = px.pie(
                 values=sector_counts.values,
                 names=sector_counts.index,
@@ -205,7 +286,7 @@ if selected_criteria and weights:
     with viz_col3:
         # Country composition
         if 'country' in df.columns:
-            country_counts = df_filtered['country'].value_counts()
+            country_counts = basket_counts('country')
             fig_country = px.pie(
                 values=country_counts.values,
                 names=country_counts.index,
@@ -222,7 +303,7 @@ if selected_criteria and weights:
     with viz_col4:
         # Market Cap composition
         if 'Market cap group' in df.columns:
-            mcap_counts = df_filtered['Market cap group'].value_counts()
+            mcap_counts = basket_counts('Market cap group')
             fig_mcap = px.pie(
                 values=mcap_counts.values,
                 names=mcap_counts.index,
@@ -242,7 +323,7 @@ if selected_criteria and weights:
     alignment_cols = ['Most_aligned_rev_name', 'Least_aligned_rev_name']
     for col in alignment_cols:
         if col in df_filtered.columns:
-            value_counts = df_filtered[col].value_counts().head(10)
+            value_counts = basket_counts(col).head(10)
             fig = px.bar(
                 x=value_counts.index,
                 y=value_counts.values,
@@ -285,7 +366,39 @@ if selected_criteria and weights:
             st.markdown("**Market Cap Distribution:**")
             for mcap, count in mcap_counts.items():
                 st.write(f"- {mcap}: {count} companies ({count/len(df_filtered)*100:.1f}%)")
-    
+
+    # Compare composition against the full universe and cross-tabulate dimensions
+    with st.expander("Composition vs Universe"):
+        comparison_dims = [dim for dim in ['gics_1_sector', 'country', 'Market cap group']
+                           if dim in composition]
+        if comparison_dims:
+            compare_dim = st.selectbox(
+                "Dimension",
+                options=comparison_dims,
+                key="composition_compare_dim"
+            )
+            st.dataframe(
+                basket_composition[compare_dim]
+                .rename(columns={
+                    'count': 'Basket count',
+                    'pct': 'Basket %',
+                    'benchmark_count': 'Universe count',
+                    'benchmark_pct': 'Universe %',
+                    'active_pct': 'Active %',
+                    'pct_of_benchmark': '% of universe selected'
+                })
+                .style.format('{:.1f}', subset=['Basket %', 'Universe %', 'Active %', '% of universe selected'])
+            )
+
+            crosstab_dims = [dim for dim in ['country', 'Market cap group'] if dim in composition]
+            if 'gics_1_sector' in composition and crosstab_dims:
+                crosstab_dim = st.selectbox(
+                    "Cross-tab sector by",
+                    options=crosstab_dims,
+                    key="composition_crosstab_dim"
+                )
+                st.dataframe(composition.crosstab('gics_1_sector', crosstab_dim, basket_mask))
+
     # Display filtered companies
     st.markdown("---")
     st.subheader("Top Companies")
@@ -295,11 +408,13 @@ if selected_criteria and weights:
     if 'Market cap group' in df.columns:
         display_columns.append('Market cap group')
         
-    st.dataframe(
-        df_filtered[display_columns]
-        .sort_values('Composite_Score', ascending=False)
-        .style.format({'Composite_Score': '{:.3f}'})
-        .background_gradient(subset=['Composite_Score'], cmap='Blues')
+    paginated_table(
+        df_filtered,
+        order=score_order(df_filtered['Composite_Score']),
+        columns=display_columns,
+        key="top_companies",
+        formats={'Composite_Score': '{:.3f}'},
+        gradient='Composite_Score'
     )
 
     # Add download button for filtered results
@@ -312,6 +427,33 @@ if selected_criteria and weights:
         help="Download the filtered company data as a CSV file"
     )
 
+    # Portfolio weighting schemes shared by the returns and fundamentals sections
+    st.header("Portfolio Weighting")
+    weight_col1, weight_col2 = st.columns(2)
+    with weight_col1:
+        # Market-cap weighting is only offered when the file has a market-cap column
+        cap_candidates = market_cap_columns(numeric_cols)
+        scheme_options = ['Equal'] + (['Market cap'] if cap_candidates else []) + ['Composite score']
+        selected_schemes = st.multiselect(
+            "Weighting schemes",
+            options=scheme_options,
+            default=['Equal'],
+            help="Every selected scheme is aggregated in the same pass over the data"
+        )
+    cap_column = None
+    if cap_candidates:
+        with weight_col2:
+            cap_column = st.selectbox(
+                "Market cap column",
+                options=cap_candidates,
+                help="Numeric column used for market-cap weighting"
+            )
+    weight_columns = {'Equal': None, 'Market cap': cap_column, 'Composite score': 'Composite_Score'}
+    portfolio_weights = basket_weights(
+        df_filtered,
+        {f"Portfolio ({scheme})": weight_columns[scheme] for scheme in selected_schemes or ['Equal']}
+    )
+
     # Portfolio Returns Analysis
     st.header("Portfolio Returns Analysis")
     if RETURNS is None or MSCIWRLD is None:
@@ -345,26 +487,17 @@ if selected_criteria and weights:
             start_date_dt = pd.to_datetime(start_date)
             end_date_dt = pd.to_datetime(end_date)
             
-            # Filter RETURNS data for shortlisted portfolio
-            portfolio_returns = RETURNS.loc[start_date_dt:end_date_dt, df_filtered['ID'].tolist()]
-            
-            # Filter RETURNS data for MSCI World constituents
-            msci_returns = RETURNS.loc[start_date_dt:end_date_dt, MSCIWRLD['ID'].tolist()]
-            
-            # Calculate equal-weighted average returns
-            portfolio_avg_returns = portfolio_returns.mean(axis=1)
-            msci_avg_returns = msci_returns.mean(axis=1)
+            # Aggregate every weighting scheme in one sparse product
+            portfolio_avg_returns = aggregate_panel(RETURNS.loc[start_date_dt:end_date_dt], portfolio_weights)
             
-            # Calculate cumulative returns (starting from 0)
+            # Calculate cumulative returns (starting from 0); the MSCI World
+            # index is rebased from its incrementally maintained cumulative series
             portfolio_cum_returns = (1 + portfolio_avg_returns).cumprod()
-            msci_cum_returns = (1 + msci_avg_returns).cumprod()
+            msci_cum_returns = REFERENCE.benchmarks['returns'].rebased(start_date_dt, end_date_dt)
             
             # Create the plot
             fig = px.line(
-                pd.DataFrame({
-                    'Portfolio': portfolio_cum_returns,
-                    'MSCI World': msci_cum_returns
-                }),
+                portfolio_cum_returns.assign(**{'MSCI World': msci_cum_returns}),
                 title='Cumulative Returns Comparison (Starting at 1)',
                 labels={'value': 'Cumulative Return', 'index': 'Date'}
             )
@@ -383,20 +516,75 @@ if selected_criteria and weights:
             portfolio_total_return = (portfolio_cum_returns.iloc[-1] - 1) * 100
             msci_total_return = (msci_cum_returns.iloc[-1] - 1) * 100
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric(
-                    "Portfolio Total Return",
-                    f"{portfolio_total_return:.2f}%",
-                    f"From {start_date.strftime('%Y-%m-%d')} to {portfolio_cum_returns.index[-1].strftime('%Y-%m-%d')}"
-                )
-            with col2:
+            return_cols = st.columns(len(portfolio_total_return) + 1)
+            for return_col, (portfolio_name, total_return) in zip(return_cols, portfolio_total_return.items()):
+                with return_col:
+                    st.metric(
+                        f"{portfolio_name} Total Return",
+                        f"{total_return:.2f}%",
+                        f"From {start_date.strftime('%Y-%m-%d')} to {portfolio_cum_returns.index[-1].strftime('%Y-%m-%d')}"
+                    )
+            with return_cols[-1]:
                 st.metric(
                     "MSCI World Total Return",
                     f"{msci_total_return:.2f}%",
                     f"From {start_date.strftime('%Y-%m-%d')} to {msci_cum_returns.index[-1].strftime('%Y-%m-%d')}"
                 )
 
+            # Risk analytics against MSCI World on cached covariance estimates
+            st.subheader("Risk Analytics")
+            risk_scheme = st.selectbox(
+                "Weighting scheme",
+                options=selected_schemes or ['Equal'],
+                key="risk_scheme",
+                help="Realised and ex-ante risk are computed for this scheme's weights"
+            )
+            risk_column = weight_columns[risk_scheme]
+            risk_ids = df_filtered['ID'].tolist()
+            risk_weights = None if risk_column is None else df_filtered[risk_column].to_numpy(dtype=float)
+            risk_engine = get_risk_engine(
+                tuple(df['ID'].tolist()),
+                (RETURNS.shape, RETURNS.index[-1]),
+                tuple(REFERENCE.signatures.get('msci', ())),
+                RETURNS,
+                REFERENCE.benchmarks['returns'].mean
+            )
+            risk = risk_engine.metrics(risk_ids, start_date_dt, end_date_dt, risk_weights)
+            risk_cols = st.columns(4)
+            with risk_cols[0]:
+                st.metric("Volatility", f"{risk['Volatility']:.2%}",
+                          f"Ex-ante {risk['Ex-ante Volatility']:.2%}", delta_color="off")
+            with risk_cols[1]:
+                st.metric("Beta", f"{risk['Beta']:.2f}",
+                          f"Ex-ante {risk['Ex-ante Beta']:.2f}", delta_color="off")
+            with risk_cols[2]:
+                st.metric("Tracking Error", f"{risk['Tracking Error']:.2%}",
+                          f"Ex-ante {risk['Ex-ante Tracking Error']:.2%}", delta_color="off")
+            with risk_cols[3]:
+                st.metric("Max Drawdown", f"{risk['Max Drawdown']:.2%}")
+            st.caption(f"Covariance shrinkage intensity: {risk['Shrinkage']:.2f}")
+
+            rolling_window = st.slider(
+                "Rolling window (trading days)",
+                min_value=20,
+                max_value=252,
+                value=63,
+                step=1,
+                key="risk_rolling_window"
+            )
+            rolling = risk_engine.rolling(risk_ids, start_date_dt, end_date_dt, rolling_window, risk_weights)
+            fig = px.line(
+                rolling[['Volatility', 'Tracking Error']],
+                title=f'Rolling {rolling_window}-day Volatility and Tracking Error ({risk_scheme} weighted)',
+                labels={'value': 'Annualised', 'index': 'Date'}
+            )
+            fig.update_layout(
+                showlegend=True,
+                legend_title_text='',
+                hovermode='x unified'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
     # Portfolio Fundamentals Analysis
     st.header("Portfolio Fundamentals Analysis")
     if FUNDAMENTALS is None:
@@ -433,30 +621,21 @@ if selected_criteria and weights:
             # Filter data from start date to latest
             fund_data = fund_data.loc[start_date_dt:]
             
-            # Get available IDs in the fundamental data
-            available_ids = fund_data.columns.tolist()
+            # Check that the portfolio and MSCI World have IDs in the fundamental data
+            available_ids = fund_data.columns
+            has_portfolio_ids = portfolio_weights.ids.isin(available_ids).any()
+            has_msci_ids = MSCIWRLD['ID'].isin(available_ids).any()
             
-            # Filter portfolio and MSCI IDs to only include those available in the fundamental data
-            portfolio_ids = [id for id in df_filtered['ID'].tolist() if id in available_ids]
-            msci_ids = [id for id in MSCIWRLD['ID'].tolist() if id in available_ids]
-            
-            if not portfolio_ids or not msci_ids:
+            if not has_portfolio_ids or not has_msci_ids:
                 st.error(f"No matching IDs found in the {selected_item} data. Please check the data availability.")
             else:
-                # Filter columns for portfolio and MSCI World
-                portfolio_data = fund_data[portfolio_ids]
-                msci_data = fund_data[msci_ids]
-                
-                # Calculate aggregated values (using mean)
-                portfolio_agg = portfolio_data.mean(axis=1)
-                msci_agg = msci_data.mean(axis=1)
+                # Aggregate every weighting scheme in one sparse product
+                portfolio_agg = aggregate_panel(fund_data, portfolio_weights)
+                msci_agg = REFERENCE.benchmarks[selected_item].mean.loc[start_date_dt:]
                 
                 # Create the plot
                 fig = px.line(
-                    pd.DataFrame({
-                        'Portfolio': portfolio_agg,
-                        'MSCI World': msci_agg
-                    }),
+                    portfolio_agg.assign(**{'MSCI World': msci_agg}),
                     title=f'{selected_item.capitalize()} Comparison',
                     labels={'value': selected_item.capitalize(), 'index': 'Date'}
                 )
@@ -472,15 +651,16 @@ if selected_criteria and weights:
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Calculate and display summary statistics
-                col1, col2 = st.columns(2)
-                with col1:
-                    portfolio_value = portfolio_agg.mean()
-                    st.metric(
-                        "Portfolio Mean",
-                        f"{portfolio_value:.2f}",
-                        f"From {start_date.strftime('%Y-%m-%d')} to {fund_data.index[-1].strftime('%Y-%m-%d')}"
-                    )
-                with col2:
+                portfolio_means = portfolio_agg.mean()
+                mean_cols = st.columns(len(portfolio_means) + 1)
+                for mean_col, (portfolio_name, portfolio_value) in zip(mean_cols, portfolio_means.items()):
+                    with mean_col:
+                        st.metric(
+                            f"{portfolio_name} Mean",
+                            f"{portfolio_value:.2f}",
+                            f"From {start_date.strftime('%Y-%m-%d')} to {fund_data.index[-1].strftime('%Y-%m-%d')}"
+                        )
+                with mean_cols[-1]:
                     msci_value = msci_agg.mean()
                     st.metric(
                         "MSCI World Mean",
@@ -490,6 +670,8 @@ if selected_criteria and weights:
 
     # ChatGPT Portfolio Analysis
     st.header("Ask ChatGPT about the Portfolio")
+    from chat_analysis import analyze_with_chatgpt
+    from job_queue import ACTIVE_STATUSES, DONE, FAILED, CANCELLED
     
     # Column selection for analysis
     available_columns = df_filtered.columns.tolist()
@@ -522,36 +704,65 @@ if selected_criteria and weights:
         elif not question:
             st.error("Please enter a question")
         else:
-            with st.spinner("Analyzing portfolio with ChatGPT..."):
-                try:
-                    # Get analysis from ChatGPT
-                    analysis = analyze_with_chatgpt(
-                        df_filtered[selected_columns],
-                        question,
-                        chunk_size=chunk_size
-                    )
-                    
-                    # Display results
-                    st.markdown("### Analysis Results")
-                    st.markdown(analysis)
-                    
-                except Exception as e:
-                    st.error(f"Error during analysis: {str(e)}")
+            # Run the analysis in the background so it survives widget changes;
+            # an identical question on the same data reuses the existing job
+            st.session_state['chatgpt_job'] = get_job_queue().submit(
+                analyze_with_chatgpt,
+                df_filtered[selected_columns],
+                question,
+                chunk_size=int(chunk_size)
+            )
+
+    chatgpt_job = st.session_state.get('chatgpt_job')
+    if chatgpt_job is not None:
+        job_queue = get_job_queue()
+        job_status = job_queue.status(chatgpt_job)
+        if job_status in ACTIVE_STATUSES:
+            st.info(f"Analysis {job_status}... results will appear here when the job finishes.")
+            refresh_col, cancel_col = st.columns(2)
+            with refresh_col:
+                st.button("Refresh analysis status")
+            with cancel_col:
+                if st.button("Cancel analysis"):
+                    job_queue.cancel(chatgpt_job)
+                    st.rerun()
+        elif job_status == DONE:
+            # Display results
+            st.markdown("### Analysis Results")
+            st.markdown(job_queue.result(chatgpt_job))
+        elif job_status == FAILED:
+            try:
+                job_queue.result(chatgpt_job)
+            except Exception as e:
+                st.error(f"Error during analysis: {str(e)}")
+        elif job_status == CANCELLED:
+            st.warning("Analysis was cancelled")
 
     # Company View Module
     st.header("Company View")
     
-    # Company selection dropdown
-    company_names = df['short_name'].tolist()
-    selected_company = st.selectbox(
+    # Company search: only the ranked candidates for the typed query are sent to the browser
+    company_query = st.text_input(
+        "Search for a company",
+        placeholder="Type a company name or ID",
+        help="Prefix and fuzzy matching over company names and IDs"
+    )
+    if company_query.strip():
+        company_options = search_index.search(company_query, limit=25)['position'].tolist()
+    else:
+        # Before anything is typed, offer the top-scored basket companies
+        company_options = df_filtered.index[score_order(df_filtered['Composite_Score'])[:25]].tolist()
+    selected_position = st.selectbox(
         "Select a company",
-        options=company_names,
+        options=company_options,
+        format_func=lambda position: f"{df.at[position, 'short_name']} ({df.at[position, 'ID']})",
         help="Choose a company to view its detailed analysis"
     )
+    selected_company = df.at[selected_position, 'short_name'] if selected_position is not None else None
     
     if selected_company:
         # Get company ID
-        company_id = df[df['short_name'] == selected_company]['ID'].iloc[0]
+        company_id = df.at[selected_position, 'ID']
         
         # Filter RBICS data
         company_rbics = RBICS_DF[RBICS_DF.barrid == company_id].copy()
@@ -559,7 +770,7 @@ if selected_criteria and weights:
         if not company_rbics.empty:
             # Display company details
             st.subheader("Company Details")
-            company_details = df[df['short_name'] == selected_company].iloc[0]
+            company_details = df.loc[selected_position]
             for col in company_details.index:
                 if col != 'ID':  # Skip ID as it's internal
                     st.write(f"**{col}:** {company_details[col]}")
@@ -597,3 +808,21 @@ else:
     - `country`: Company's country (optional)
     - `Market cap group`: Market capitalization category (optional)
     """) 
+
+# Startup timing report, shown near the top of the page
+startup.mark('dashboard render')
+with startup_container:
+    with st.expander("Startup timings"):
+        st.caption(
+            "State restored from snapshot" if SNAPSHOT_STATUS['restored']
+            else "State built from source files"
+        )
+        st.dataframe(startup.report().style.format({'seconds': '{:.2f}'}))
+        # Load timings only describe this run when it loaded reference data
+        reference_actions = {change['action'] for change in REFERENCE_CHANGES.values()}
+        if LOAD_TIMINGS is not None and reference_actions - {'unchanged'}:
+            if reference_actions & {'parsed', 'appended'}:
+                st.caption(f"Workbook parse timings (Excel engine: {LOAD_TIMINGS.attrs.get('engine') or 'openpyxl'})")
+            else:
+                st.caption("Reference data restored from the panel store")
+            st.dataframe(LOAD_TIMINGS.style.format({'seconds': '{:.2f}'}))
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+def transcript_hash(text: str) -> str:
+    """
+    Hash a conference call transcript so unchanged transcripts can be recognised.
+
+    Args:
+        text: Transcript text
+
+    Returns:
+        Hex SHA-256 digest of the transcript
+    """
+    return hashlib.sha256(str(text).encode('utf-8')).hexdigest()
+
+
+class AnalysisStore:
+    """
+    Append-only JSON Lines file of completed analyses keyed by company and
+    transcript hash.
+
+    Each result is one appended line, so saving costs the size of that result
+    rather than of the whole store; on load the last line for a key wins and
+    a line torn by a crash is skipped. Transcripts being analysed are tracked
+    as in flight, so concurrent requests for the same transcript wait for the
+    first one instead of sending it again.
+    """
+
+    def __init__(self, path: str = 'call_analyses.jsonl'):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._results: Dict[str, str] = {}
+        self._in_flight: Dict[str, threading.Event] = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self._results[record['key']] = record['analysis']
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            # Start appends on a fresh line after a torn last record
+            if self.path.stat().st_size and not line.endswith('\n'):
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write('\n')
+        except OSError:
+            pass
+
+    @staticmethod
+    def key(company: str, call_hash: str) -> str:
+        return f"{company}::{call_hash}"
+
+    def get(self, company: str, call_text: str) -> Optional[str]:
+        with self._lock:
+            return self._results.get(self.key(company, transcript_hash(call_text)))
+
+    def put(self, company: str, call_text: str, analysis: str) -> None:
+        key = self.key(company, transcript_hash(call_text))
+        # Appends have their own lock, so lookups never wait on disk writes
+        with self._write_lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'key': key, 'analysis': analysis}) + '\n')
+        with self._lock:
+            self._results[key] = analysis
+
+    def analyze(self, company: str, call_text: str, analyze_fn: Callable[[str], str]) -> Tuple[str, bool]:
+        """
+        Return the stored analysis of a transcript, analysing it at most once.
+
+        If another thread is already analysing the same transcript, this waits
+        for it and returns its result; if that attempt failed, the transcript
+        is analysed here instead.
+
+        Args:
+            company: Company name
+            call_text: Transcript text
+            analyze_fn: Function sending a transcript to the AI service
+
+        Returns:
+            Tuple of (analysis, True if it was not sent by this call)
+        """
+        key = self.key(company, transcript_hash(call_text))
+        while True:
+            with self._lock:
+                if key in self._results:
+                    return self._results[key], True
+                event = self._in_flight.get(key)
+                owner = event is None
+                if owner:
+                    event = self._in_flight[key] = threading.Event()
+            if not owner:
+                event.wait()
+                continue
+            try:
+                analysis = analyze_fn(call_text)
+                self.put(company, call_text, analysis)
+                return analysis, False
+            finally:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+                event.set()
+
+
+class BatchCallAnalysis:
+    """
+    Background analysis of every conference call in a basket.
+
+    Companies are analysed with bounded concurrency on a worker thread so the
+    Streamlit session stays responsive; each result is persisted as soon as it
+    arrives. Transcripts already in the store are never sent again.
+    """
+
+    def __init__(self, calls: List[Tuple[str, str]], analyze_fn: Callable[[str], str],
+                 store: AnalysisStore, max_workers: int = 4):
+        self.calls = calls
+        self.analyze_fn = analyze_fn
+        self.store = store
+        self.max_workers = max_workers
+        self.results: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.cached = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.calls)
+
+    @property
+    def completed(self) -> int:
+        with self._lock:
+            return len(self.results) + len(self.errors) + self.skipped
+
+    @property
+    def progress(self) -> float:
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'BatchCallAnalysis':
+        """Start the worker thread (no-op if already started)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """
+        Stop sending new transcripts; calls already in flight still finish.
+
+        Transcripts that were not sent are counted in ``skipped``.
+        """
+        self._cancelled.set()
+
+    def _analyze_one(self, company: str, call_text: str) -> None:
+        if self._cancelled.is_set():
+            with self._lock:
+                self.skipped += 1
+            return
+        try:
+            analysis, cached = self.store.analyze(company, call_text, self.analyze_fn)
+            with self._lock:
+                self.results[company] = analysis
+                self.cached += cached
+        except Exception as e:
+            with self._lock:
+                self.errors[company] = str(e)
+
+    def _run(self) -> None:
+        pending = []
+        for company, call_text in self.calls:
+            cached = self.store.get(company, call_text)
+            if cached is not None:
+                with self._lock:
+                    self.results[company] = cached
+                    self.cached += 1
+            else:
+                pending.append((company, call_text))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for company, call_text in pending:
+                executor.submit(self._analyze_one, company, call_text)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return one row per finished company with its analysis or error."""
+        with self._lock:
+            rows = [{'Company': company, 'Status': 'done', 'Analysis': analysis}
+                    for company, analysis in self.results.items()]
+            rows += [{'Company': company, 'Status': 'error', 'Analysis': error}
+                     for company, error in self.errors.items()]
+        return pd.DataFrame(rows, columns=['Company', 'Status', 'Analysis'])
@@ -0,0 +1,139 @@
+import re
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Rank bonuses: an exact match beats a prefix match, which beats a fuzzy match
+EXACT_BONUS = 3.0
+PREFIX_BONUS = 2.0
+WORD_PREFIX_BONUS = 1.0
+
+
+def normalize(text) -> str:
+    """Lowercase and collapse punctuation/whitespace for matching."""
+    return re.sub(r'[^0-9a-z]+', ' ', str(text).lower()).strip()
+
+
+def trigrams(text: str) -> List[str]:
+    """Trigrams of a padded key, so word starts and ends get their own grams."""
+    padded = f'  {text} '
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def query_trigrams(text: str) -> List[str]:
+    """
+    Trigrams of a query.
+
+    Queries may be a fragment from the middle of a name or ID, so padding is
+    only used for queries too short to have an inner trigram.
+    """
+    if len(text) < 3:
+        return trigrams(text)
+    return list({text[i:i + 3] for i in range(len(text) - 2)})
+
+
+class CompanySearchIndex:
+    """
+    Prefix and fuzzy search over company names and IDs.
+
+    Prefix lookups use binary search over sorted keys (full names, IDs and
+    every word of a name); fuzzy lookups score the share of the query's
+    trigrams found in a name or ID through an inverted index, so typos and
+    fragments match long names as well as short ones. A query only touches
+    its prefix range and the matching postings, never the whole universe.
+    """
+
+    def __init__(self, df: pd.DataFrame, name_col: str = 'short_name', id_col: str = 'ID'):
+        self.names = df[name_col].astype(str).to_numpy()
+        self.ids = df[id_col].astype(str).to_numpy() if id_col in df.columns else None
+        self.positions = df.index.to_numpy()
+        normalized = [normalize(name) for name in self.names]
+
+        keys, rows, kinds = [], [], []
+        for row, name in enumerate(normalized):
+            keys.append(name)
+            rows.append(row)
+            kinds.append(PREFIX_BONUS)
+            for word in name.split(' ')[1:]:
+                keys.append(word)
+                rows.append(row)
+                kinds.append(WORD_PREFIX_BONUS)
+        if self.ids is not None:
+            for row, company_id in enumerate(self.ids):
+                keys.append(normalize(company_id))
+                rows.append(row)
+                kinds.append(PREFIX_BONUS)
+        order = np.argsort(np.array(keys, dtype=object), kind='stable')
+        self.keys = np.array(keys, dtype=object)[order].astype(str)
+        self.key_rows = np.array(rows, dtype=np.int64)[order]
+        self.key_bonus = np.array(kinds, dtype=float)[order]
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for row, name in enumerate(normalized):
+            grams = set(trigrams(name))
+            if self.ids is not None:
+                grams.update(trigrams(normalize(self.ids[row])))
+            for gram in grams:
+                postings[gram].append(row)
+        self.postings = {gram: np.array(rows, dtype=np.int64) for gram, rows in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, limit: int = 20, min_similarity: float = 0.3) -> pd.DataFrame:
+        """
+        Return a small ranked candidate list for a typed query.
+
+        Args:
+            query: Partial company name or ID
+            limit: Maximum number of candidates
+            min_similarity: Minimum share of the query's trigrams a fuzzy
+                match must contain
+
+        Returns:
+            DataFrame with 'position' (index label in the source frame),
+            'name', 'id' and 'score', best match first
+        """
+        query = normalize(query)
+        rows = [np.empty(0, dtype=np.int64)]
+        row_scores = [np.empty(0)]
+        if query:
+            # Prefix matches: all keys in [query, query + max char)
+            lo = np.searchsorted(self.keys, query, side='left')
+            hi = np.searchsorted(self.keys, query + '\uffff', side='left')
+            bonus = self.key_bonus[lo:hi].copy()
+            bonus[(self.keys[lo:hi] == query) & (bonus == PREFIX_BONUS)] = EXACT_BONUS
+            prefix_rows, inverse = np.unique(self.key_rows[lo:hi], return_inverse=True)
+            best = np.zeros(len(prefix_rows))
+            np.maximum.at(best, inverse, bonus)
+            rows.append(prefix_rows)
+            row_scores.append(best)
+
+            query_grams = query_trigrams(query)
+            grams = [gram for gram in query_grams if gram in self.postings]
+            if grams:
+                fuzzy_rows, shared = np.unique(
+                    np.concatenate([self.postings[gram] for gram in grams]), return_counts=True
+                )
+                similarity = shared / len(query_grams)
+                keep = similarity >= min_similarity
+                rows.append(fuzzy_rows[keep])
+                row_scores.append(similarity[keep])
+
+        # Prefix bonus and fuzzy similarity add up per candidate row
+        candidates, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.zeros(len(candidates))
+        np.add.at(scores, inverse, np.concatenate(row_scores))
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        order = np.lexsort((self.names[candidates], -scores))
+        candidates, scores = candidates[order], scores[order]
+        return pd.DataFrame({
+            'position': self.positions[candidates],
+            'name': self.names[candidates],
+            'id': self.ids[candidates] if self.ids is not None else None,
+            'score': scores,
+        })
@@ -0,0 +1,178 @@
+import pandas as pd
+import numpy as np
+from typing import List, Dict, Optional, Sequence
+
+
+class CategoryCodes:
+    """
+    Integer encoding of a single categorical column.
+
+    Missing values are encoded as -1 and ignored by every count, mirroring
+    the behaviour of ``value_counts()``.
+    """
+
+    def __init__(self, values: pd.Series):
+        codes, labels = pd.factorize(values, sort=True)
+        self.codes = codes.astype(np.int64)
+        self.labels = pd.Index(labels, name=values.name)
+        self.valid = self.codes >= 0
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def bincount(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Count rows per category, optionally restricted to a basket mask.
+
+        Args:
+            mask: Boolean array aligned with the encoded rows (None = all rows)
+
+        Returns:
+            Array of counts, one per label
+        """
+        keep = self.valid if mask is None else (self.valid & mask)
+        return np.bincount(self.codes[keep], minlength=len(self.labels))
+
+
+class CompositionEngine:
+    """
+    Basket composition over categorical dimensions encoded once as integer codes.
+
+    The universe passed at construction acts as the benchmark: its counts are
+    computed once, so breaking down any basket mask only needs one
+    ``np.bincount`` per dimension.
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensions: Sequence[str]):
+        self.n_rows = len(df)
+        self.dimensions = [dim for dim in dimensions if dim in df.columns]
+        self.codes: Dict[str, CategoryCodes] = {
+            dim: CategoryCodes(df[dim]) for dim in self.dimensions
+        }
+        self.benchmark_counts: Dict[str, np.ndarray] = {
+            dim: codes.bincount() for dim, codes in self.codes.items()
+        }
+
+    def __contains__(self, dim: str) -> bool:
+        return dim in self.codes
+
+    def _mask(self, mask) -> np.ndarray:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self.n_rows,):
+            raise ValueError(
+                f"Basket mask has shape {mask.shape}, expected ({self.n_rows},)"
+            )
+        return mask
+
+    def counts(self, dim: str, mask) -> pd.Series:
+        """
+        Count basket members per category, like ``df[mask][dim].value_counts()``.
+
+        Args:
+            dim: Categorical column name
+            mask: Boolean basket mask aligned with the universe rows
+
+        Returns:
+            Series of non-zero counts sorted in descending order
+        """
+        counts = self.codes[dim].bincount(self._mask(mask))
+        series = pd.Series(counts, index=self.codes[dim].labels, name='count')
+        series = series[series > 0]
+        return series.sort_values(ascending=False, kind='stable')
+
+    def counts_matrix(self, dim: str, masks: np.ndarray, names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Count members per category for many baskets with a single bincount.
+
+        Args:
+            dim: Categorical column name
+            masks: Boolean array of shape (rows, baskets)
+            names: Optional basket names used as column labels
+
+        Returns:
+            DataFrame of counts indexed by category with one column per basket
+        """
+        masks = np.asarray(masks, dtype=bool)
+        if masks.ndim != 2 or masks.shape[0] != self.n_rows:
+            raise ValueError(
+                f"Basket masks have shape {masks.shape}, expected ({self.n_rows}, n_baskets)"
+            )
+        codes = self.codes[dim]
+        n_baskets = masks.shape[1]
+        rows, baskets = np.nonzero(masks & codes.valid[:, None])
+        counts = np.bincount(codes.codes[rows] * n_baskets + baskets,
+                             minlength=len(codes) * n_baskets).reshape(len(codes), n_baskets)
+        return pd.DataFrame(counts, index=codes.labels,
+                            columns=list(names) if names is not None else None)
+
+    def compare(self, dim: str, mask) -> pd.DataFrame:
+        """
+        Compare the basket's composition against the benchmark universe.
+
+        Args:
+            dim: Categorical column name
+            mask: Boolean basket mask aligned with the universe rows
+
+        Returns:
+            DataFrame with basket and benchmark counts and percentages, the
+            active weight (basket % minus benchmark %) and the basket's share
+            of the benchmark's members, sorted by basket count
+        """
+        return self.breakdown(mask, [dim])[dim]
+
+    def breakdown(self, mask, dimensions: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Compute basket-vs-benchmark composition for several dimensions in one pass.
+
+        Args:
+            mask: Boolean basket mask aligned with the universe rows
+            dimensions: Dimensions to include (default: all encoded dimensions)
+
+        Returns:
+            Dictionary mapping each dimension to its comparison table
+        """
+        mask = self._mask(mask)
+        result = {}
+        for dim in dimensions or self.dimensions:
+            codes = self.codes[dim]
+            basket = codes.bincount(mask)
+            benchmark = self.benchmark_counts[dim]
+            basket_total = max(basket.sum(), 1)
+            benchmark_total = max(benchmark.sum(), 1)
+            table = pd.DataFrame({
+                'count': basket,
+                'pct': basket / basket_total * 100,
+                'benchmark_count': benchmark,
+                'benchmark_pct': benchmark / benchmark_total * 100,
+            }, index=codes.labels)
+            table['active_pct'] = table['pct'] - table['benchmark_pct']
+            table['pct_of_benchmark'] = np.divide(
+                basket * 100.0, benchmark,
+                out=np.zeros(len(basket)), where=benchmark > 0
+            )
+            result[dim] = table.sort_values('count', ascending=False, kind='stable')
+        return result
+
+    def crosstab(self, row_dim: str, col_dim: str, mask=None, normalize: bool = False) -> pd.DataFrame:
+        """
+        Cross-tabulate two dimensions (e.g. sector x country) for a basket.
+
+        Args:
+            row_dim: Dimension used for the rows
+            col_dim: Dimension used for the columns
+            mask: Boolean basket mask (None = whole universe)
+            normalize: Return percentages of the basket instead of counts
+
+        Returns:
+            DataFrame of counts indexed by row_dim labels with col_dim columns
+        """
+        rows, cols = self.codes[row_dim], self.codes[col_dim]
+        keep = rows.valid & cols.valid
+        if mask is not None:
+            keep &= self._mask(mask)
+        flat = rows.codes[keep] * len(cols) + cols.codes[keep]
+        counts = np.bincount(flat, minlength=len(rows) * len(cols)).reshape(len(rows), len(cols))
+        table = pd.DataFrame(counts, index=rows.labels, columns=cols.labels)
+        if normalize:
+            table = table / max(counts.sum(), 1) * 100
+        return table
@@ -0,0 +1,99 @@
+import importlib.util
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from workers import WorkerPool
+
+# Reference workbooks loaded at startup: name -> (path, read_excel keyword arguments)
+REFERENCE_WORKBOOKS = {
+    'returns': ('returns.xlsx', {'index_col': 'DATE'}),
+    'msci': ('msci_wrld.xlsx', {}),
+    'rbics': ('rbics.xlsx', {}),
+    'capex': ('fundamentals/capex.xlsx', {'index_col': 'DATE'}),
+    'revenue': ('fundamentals/revenue.xlsx', {'index_col': 'DATE'}),
+    'ebitda': ('fundamentals/ebitda.xlsx', {'index_col': 'DATE'}),
+    # Add more fundamental items as needed
+}
+
+FUNDAMENTAL_ITEMS = ['capex', 'revenue', 'ebitda']
+
+# Date x ID panels (as opposed to static reference tables)
+PANEL_ITEMS = ['returns'] + FUNDAMENTAL_ITEMS
+
+
+def excel_engine() -> Optional[str]:
+    """
+    Pick the fastest installed Excel engine.
+
+    Returns:
+        'calamine' when python-calamine is installed, otherwise None
+        (pandas' default openpyxl engine)
+    """
+    if importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    return None
+
+
+def read_workbook(path: str, read_kwargs: Dict[str, Any], engine: Optional[str] = None) -> Tuple[pd.DataFrame, float]:
+    """
+    Read one workbook and time the parse.
+
+    Args:
+        path: Path to the Excel file
+        read_kwargs: Extra keyword arguments for pd.read_excel
+        engine: Excel engine to use (None = pandas default)
+
+    Returns:
+        Tuple of the parsed dataframe and the parse time in seconds
+    """
+    start = time.perf_counter()
+    df = pd.read_excel(path, engine=engine, **read_kwargs)
+    return df, time.perf_counter() - start
+
+
+def load_workbooks(workbooks: Dict[str, Tuple[str, Dict[str, Any]]] = REFERENCE_WORKBOOKS,
+                   max_workers: Optional[int] = None,
+                   engine: Optional[str] = None) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """
+    Parse independent workbooks concurrently in a process pool.
+
+    Excel parsing is CPU-bound, so separate processes let the total load time
+    approach that of the largest workbook instead of the sum of all of them.
+
+    Args:
+        workbooks: Mapping of name -> (path, read_excel keyword arguments)
+        max_workers: Maximum number of worker processes (default: one per workbook)
+        engine: Excel engine to use (default: fastest installed)
+
+    Returns:
+        Tuple of (name -> dataframe, per-file timing report). The report has
+        one row per workbook plus a 'total' row with the wall-clock time.
+    """
+    engine = engine or excel_engine()
+    start = time.perf_counter()
+    frames, timings = {}, []
+    with WorkerPool(max_workers=max_workers or len(workbooks)) as executor:
+        futures = {
+            name: executor.submit(read_workbook, path, read_kwargs, engine)
+            for name, (path, read_kwargs) in workbooks.items()
+        }
+        for name, future in futures.items():
+            df, seconds = future.result()
+            frames[name] = df
+            timings.append({
+                'workbook': workbooks[name][0],
+                'rows': len(df),
+                'columns': df.shape[1],
+                'seconds': seconds
+            })
+    timings.append({
+        'workbook': 'total',
+        'rows': sum(row['rows'] for row in timings),
+        'columns': sum(row['columns'] for row in timings),
+        'seconds': time.perf_counter() - start
+    })
+    report = pd.DataFrame(timings).set_index('workbook')
+    report.attrs['engine'] = engine or 'openpyxl'
+    return frames, report
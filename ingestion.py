@@ -0,0 +1,318 @@
+import json
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from data_loader import load_workbooks, REFERENCE_WORKBOOKS, PANEL_ITEMS
+
+PANEL_STORE_DIR = 'panel_store'
+
+
+def file_signature(path: str) -> List[int]:
+    """Cheap change detector for a source workbook: [mtime_ns, size]."""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def compute_delta(stored: pd.DataFrame, fresh: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Split a freshly parsed panel into what the stored panel is missing.
+
+    Values already present in the stored panel are kept as they are, so
+    revisions to historical data need a full rebuild (delete the panel store).
+
+    Args:
+        stored: Date x ID panel already ingested
+        fresh: Newly parsed date x ID panel
+
+    Returns:
+        Tuple of (new ID columns over the stored dates, rows for new dates)
+    """
+    new_ids = fresh.columns.difference(stored.columns, sort=False)
+    new_dates = fresh.index.difference(stored.index, sort=False)
+    cols_delta = fresh.loc[fresh.index.intersection(stored.index), new_ids]
+    rows_delta = fresh.loc[new_dates]
+    return cols_delta, rows_delta
+
+
+def apply_delta(panel: pd.DataFrame, cols_delta: Optional[pd.DataFrame],
+                rows_delta: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Extend a panel with new ID columns and then new date rows.
+
+    Args:
+        panel: Date x ID panel to extend
+        cols_delta: Columns for new IDs over the panel's existing dates
+        rows_delta: Rows for new dates
+
+    Returns:
+        The extended panel, sorted by date
+    """
+    if cols_delta is not None and len(cols_delta.columns):
+        panel = pd.concat([panel, cols_delta.reindex(panel.index)], axis=1)
+    if rows_delta is not None and len(rows_delta):
+        in_order = len(panel) == 0 or rows_delta.index.min() > panel.index.max()
+        panel = pd.concat([panel, rows_delta.reindex(columns=panel.columns)])
+        if not in_order:
+            panel = panel.sort_index()
+    return panel
+
+
+class PanelStore:
+    """
+    On-disk store of ingested frames as a base part plus appended delta parts.
+
+    Each frame lives in its own directory with a ``meta.json`` holding the
+    source file signature and the ordered list of parts. Appending a delta
+    writes one small part instead of rewriting the history; once a frame has
+    more than ``max_parts`` parts it is compacted back into a single part.
+    """
+
+    def __init__(self, directory: str = PANEL_STORE_DIR, max_parts: int = 20):
+        self.directory = Path(directory)
+        self.max_parts = max_parts
+
+    def _meta_path(self, name: str) -> Path:
+        return self.directory / name / 'meta.json'
+
+    def read_meta(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._meta_path(name).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, name: str, meta: Dict[str, Any]) -> None:
+        path = self._meta_path(name)
+        tmp_path = path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, path)
+
+    def _write_part(self, name: str, index: int, kind: str, data: pd.DataFrame) -> str:
+        part = f'part-{index:05d}.pkl'
+        with open(self.directory / name / part, 'wb') as f:
+            pickle.dump({'kind': kind, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return part
+
+    def load(self, name: str) -> Optional[pd.DataFrame]:
+        """Rebuild a stored frame by replaying its parts, or None if not stored."""
+        meta = self.read_meta(name)
+        if meta is None:
+            return None
+        frame = None
+        for part in meta['parts']:
+            with open(self.directory / name / part, 'rb') as f:
+                payload = pickle.load(f)
+            if payload['kind'] == 'full':
+                frame = payload['data']
+            elif payload['kind'] == 'cols':
+                frame = apply_delta(frame, payload['data'], None)
+            else:
+                frame = apply_delta(frame, None, payload['data'])
+        return frame
+
+    def write(self, name: str, frame: pd.DataFrame, signature: List[int]) -> None:
+        """Replace a stored frame with a single full part."""
+        (self.directory / name).mkdir(parents=True, exist_ok=True)
+        meta = self.read_meta(name) or {'parts': [], 'next': 0}
+        part = self._write_part(name, meta['next'], 'full', frame)
+        self._write_meta(name, {'signature': signature, 'parts': [part], 'next': meta['next'] + 1})
+        for old_part in meta['parts']:
+            if old_part != part:
+                (self.directory / name / old_part).unlink(missing_ok=True)
+
+    def append(self, name: str, cols_delta: pd.DataFrame, rows_delta: pd.DataFrame,
+               signature: List[int], frame: Optional[pd.DataFrame] = None) -> None:
+        """
+        Append delta parts for a stored frame.
+
+        Args:
+            name: Stored frame name
+            cols_delta: Columns for new IDs (skipped when empty)
+            rows_delta: Rows for new dates (skipped when empty)
+            signature: Signature of the source file the delta came from
+            frame: Fully extended frame, used when the store needs compacting
+                or no longer holds the frame
+        """
+        meta = self.read_meta(name)
+        if meta is None:
+            # The store was cleared underneath us: start over from the full frame
+            if frame is None:
+                raise ValueError(f"No stored parts for '{name}' and no frame to write")
+            self.write(name, frame, signature)
+            return
+        parts, next_index = list(meta['parts']), meta['next']
+        if len(cols_delta.columns):
+            parts.append(self._write_part(name, next_index, 'cols', cols_delta))
+            next_index += 1
+        if len(rows_delta):
+            parts.append(self._write_part(name, next_index, 'rows', rows_delta))
+            next_index += 1
+        self._write_meta(name, {'signature': signature, 'parts': parts, 'next': next_index})
+        if frame is not None and len(parts) > self.max_parts:
+            self.write(name, frame, signature)
+
+
+class BenchmarkSeries:
+    """
+    Equal-weighted benchmark mean of a panel, plus its cumulative index for
+    return panels (compounding is meaningless for fundamentals levels).
+
+    New dates after the last known date only need the mean of the delta rows
+    and one cumulative product over them; anything else (new benchmark IDs or
+    back-filled dates) triggers a rebuild.
+    """
+
+    def __init__(self, panel: pd.DataFrame, benchmark_ids: List[Any], returns: bool = False):
+        self.ids = pd.Index(benchmark_ids)
+        self.returns = returns
+        self.rebuild(panel)
+
+    def rebuild(self, panel: pd.DataFrame) -> None:
+        self.mean = panel[self.ids.intersection(panel.columns)].mean(axis=1)
+        self.cumulative = (1 + self.mean.fillna(0)).cumprod() if self.returns else None
+
+    def rebased(self, start: Any, end: Any) -> pd.Series:
+        """
+        Growth of 1 invested just before ``start``, up to ``end``.
+
+        Equal to compounding the mean returns over the slice, without
+        recomputing the product.
+        """
+        if self.cumulative is None:
+            raise ValueError("Cumulative index is only kept for return panels")
+        before = self.cumulative[self.cumulative.index < start]
+        base = before.iloc[-1] if len(before) else 1.0
+        return self.cumulative.loc[start:end] / base
+
+    def extend(self, panel: pd.DataFrame, new_dates: pd.Index, new_ids: pd.Index) -> None:
+        if (len(new_ids.intersection(self.ids))
+                or (len(new_dates) and len(self.mean) and new_dates.min() <= self.mean.index.max())):
+            self.rebuild(panel)
+            return
+        if not len(new_dates):
+            return
+        delta = panel.loc[new_dates, self.ids.intersection(panel.columns)].mean(axis=1)
+        self.mean = pd.concat([self.mean, delta])
+        if self.cumulative is not None:
+            start = self.cumulative.iloc[-1] if len(self.cumulative) else 1.0
+            self.cumulative = pd.concat([self.cumulative, start * (1 + delta.fillna(0)).cumprod()])
+
+
+class ReferenceData:
+    """
+    In-memory reference workbooks kept in sync with the files on disk.
+
+    ``refresh`` only stats the source files when nothing changed. Changed
+    panels are re-parsed, but only the new dates and IDs are appended to the
+    in-memory panel, the on-disk store and the derived benchmark series.
+    """
+
+    def __init__(self, workbooks: Dict[str, Tuple[str, Dict[str, Any]]] = REFERENCE_WORKBOOKS,
+                 store: Optional[PanelStore] = None, benchmark: str = 'msci',
+                 panel_items: List[str] = PANEL_ITEMS):
+        self.workbooks = workbooks
+        self.store = store or PanelStore()
+        self.benchmark = benchmark
+        self.panel_items = [item for item in panel_items if item in workbooks]
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.benchmarks: Dict[str, BenchmarkSeries] = {}
+        self.signatures: Dict[str, List[int]] = {}
+        self.load_report: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Bring every frame up to date with its source workbook.
+
+        ``load_report`` is replaced by the timings of this refresh: one row
+        per restored, parsed or appended workbook plus a 'total' row, or None
+        when nothing changed.
+
+        Returns:
+            Dictionary mapping each workbook name to what happened to it:
+            'unchanged', 'restored' (from the panel store), 'parsed' (full
+            replace) or 'appended' (with the number of new dates and IDs)
+        """
+        with self._lock:
+            start = time.perf_counter()
+            changes: Dict[str, Dict[str, Any]] = {}
+            timings = []
+            to_parse = {}
+            for name, (path, read_kwargs) in self.workbooks.items():
+                signature = file_signature(path)
+                if self.signatures.get(name) == signature:
+                    changes[name] = {'action': 'unchanged'}
+                    continue
+                meta = self.store.read_meta(name)
+                if name not in self.frames and meta is not None and meta['signature'] == signature:
+                    load_start = time.perf_counter()
+                    self.frames[name] = self.store.load(name)
+                    self.signatures[name] = signature
+                    changes[name] = {'action': 'restored'}
+                    timings.append(self._timing(name, 'restored', time.perf_counter() - load_start))
+                    continue
+                to_parse[name] = (path, read_kwargs)
+
+            engine = None
+            if to_parse:
+                parsed, parse_report = load_workbooks(to_parse)
+                engine = parse_report.attrs['engine']
+                for name, fresh in parsed.items():
+                    signature = file_signature(to_parse[name][0])
+                    # Deltas are only taken against a panel that is still in the
+                    # store; a cleared store means a full replace
+                    stored = None
+                    if name in self.panel_items and self.store.read_meta(name) is not None:
+                        stored = self.frames.get(name)
+                        if stored is None:
+                            stored = self.store.load(name)
+                    if stored is not None:
+                        cols_delta, rows_delta = compute_delta(stored, fresh)
+                        self.frames[name] = apply_delta(stored, cols_delta, rows_delta)
+                        self.store.append(name, cols_delta, rows_delta, signature, self.frames[name])
+                        changes[name] = {
+                            'action': 'appended',
+                            'new_dates': rows_delta.index,
+                            'new_ids': cols_delta.columns
+                        }
+                    else:
+                        self.frames[name] = fresh
+                        self.store.write(name, fresh, signature)
+                        changes[name] = {'action': 'parsed'}
+                    self.signatures[name] = signature
+                    timings.append(self._timing(name, changes[name]['action'],
+                                                parse_report.at[to_parse[name][0], 'seconds']))
+
+            self._update_benchmarks(changes)
+            self.load_report = None
+            if timings:
+                timings.append({'workbook': 'total', 'action': '',
+                                'rows': sum(row['rows'] for row in timings),
+                                'columns': sum(row['columns'] for row in timings),
+                                'seconds': time.perf_counter() - start})
+                self.load_report = pd.DataFrame(timings).set_index('workbook')
+                self.load_report.attrs['engine'] = engine
+            return changes
+
+    def _timing(self, name: str, action: str, seconds: float) -> Dict[str, Any]:
+        frame = self.frames[name]
+        return {'workbook': self.workbooks[name][0], 'action': action,
+                'rows': len(frame), 'columns': frame.shape[1], 'seconds': seconds}
+
+    def _update_benchmarks(self, changes: Dict[str, Dict[str, Any]]) -> None:
+        if self.benchmark not in self.frames:
+            return
+        benchmark_changed = changes.get(self.benchmark, {}).get('action') != 'unchanged'
+        benchmark_ids = self.frames[self.benchmark]['ID'].tolist()
+        for item in self.panel_items:
+            change = changes.get(item, {'action': 'unchanged'})
+            if item not in self.benchmarks or benchmark_changed or change['action'] in ('restored', 'parsed'):
+                self.benchmarks[item] = BenchmarkSeries(self.frames[item], benchmark_ids,
+                                                        returns=item == 'returns')
+            elif change['action'] == 'appended':
+                self.benchmarks[item].extend(self.frames[item], change['new_dates'], change['new_ids'])
@@ -0,0 +1,200 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from workers import WorkerPool
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATUSES = (PENDING, RUNNING)
+
+
+def job_key(fn: Callable, args: tuple, kwargs: dict) -> str:
+    """
+    Fingerprint a job submission so identical submissions can be de-duplicated.
+
+    Args:
+        fn: Module-level function to run
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Hex SHA-256 digest of the function name and pickled arguments
+    """
+    payload = pickle.dumps(
+        (fn.__module__, fn.__qualname__, args, sorted(kwargs.items())),
+        protocol=pickle.HIGHEST_PROTOCOL
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+def run_job(db_path: str, job_id: str, fn: Callable, args: tuple, kwargs: dict) -> Any:
+    """
+    Worker-side wrapper: mark the job running, unless it was cancelled while queued.
+
+    Returns:
+        fn's result, or None without calling fn for a cancelled job
+    """
+    with closing(sqlite3.connect(db_path, timeout=30)) as conn, conn:
+        started = conn.execute(
+            "UPDATE jobs SET status = ? WHERE id = ? AND status = ?",
+            (RUNNING, job_id, PENDING)
+        ).rowcount
+    if not started:
+        return None
+    return fn(*args, **kwargs)
+
+
+class JobQueue:
+    """
+    Local background job queue backed by a worker process pool and SQLite.
+
+    Jobs run outside the Streamlit script thread, so a rerun does not throw
+    them away: the dashboard keeps the job ID and polls ``status``/``result``.
+    Submitting the same function with the same arguments returns the existing
+    job instead of running the work again. A job only becomes 'running' when a
+    worker actually picks it up, and every later status change is a conditional
+    update, so a cancellation is never overwritten by a finishing worker.
+    Submitted functions must be importable (module-level) and their arguments
+    and results picklable.
+    """
+
+    def __init__(self, db_path: str = 'jobs.sqlite', max_workers: int = 2):
+        self.db_path = db_path
+        self._executor = WorkerPool(max_workers=max_workers)
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    submitted REAL NOT NULL,
+                    finished REAL,
+                    result BLOB,
+                    error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key)")
+            # Jobs left active by a previous process can never complete
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ? WHERE status IN (?, ?)",
+                (FAILED, 'Interrupted by restart', *ACTIVE_STATUSES)
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _finish(self, job_id: str, **fields: Any) -> bool:
+        """Set the fields of a job that is still active; return False otherwise."""
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ? AND status IN (?, ?)",
+                (*fields.values(), job_id, *ACTIVE_STATUSES)
+            ).rowcount > 0
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> str:
+        """
+        Queue ``fn(*args, **kwargs)`` on the worker pool.
+
+        Args:
+            fn: Module-level function to run
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Job ID; the ID of an existing pending, running or finished job
+            when an identical submission already exists
+        """
+        key = job_key(fn, args, kwargs)
+        with self._lock:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?, ?) "
+                    "ORDER BY submitted DESC LIMIT 1",
+                    (key, PENDING, RUNNING, DONE)
+                ).fetchone()
+                if row is not None:
+                    return row[0]
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, key, name, status, submitted) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, key, fn.__qualname__, PENDING, time.time())
+                )
+            future = self._executor.submit(run_job, self.db_path, job_id, fn, args, kwargs)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+        return job_id
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self._finish(job_id, status=FAILED, finished=time.time(), error=str(error))
+        else:
+            self._finish(job_id, status=DONE, finished=time.time(),
+                         result=pickle.dumps(future.result(), protocol=pickle.HIGHEST_PROTOCOL))
+
+    def status(self, job_id: str) -> Optional[str]:
+        """Return the job's status, or None for an unknown job ID."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def result(self, job_id: str) -> Any:
+        """
+        Fetch a finished job's result.
+
+        Raises:
+            RuntimeError: If the job failed, was cancelled or is not finished
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, result, error FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(job_id)
+        status, result, error = row
+        if status == DONE:
+            return pickle.loads(result)
+        if status == FAILED:
+            raise RuntimeError(error)
+        raise RuntimeError(f"Job {job_id} is {status}")
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a pending or running job.
+
+        A pending job never runs: it is removed from the pool, or skipped by
+        the worker if it was already handed to one. A running job keeps its
+        worker busy until it returns, but its result is discarded.
+
+        Returns:
+            True if the job was active and is now cancelled
+        """
+        if not self._finish(job_id, status=CANCELLED, finished=time.time()):
+            return False
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+        return True
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
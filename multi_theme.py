@@ -0,0 +1,122 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from composition import CompositionEngine
+
+# Number of set bits in every possible byte, for popcounts over packed bitsets
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+
+
+def theme_weight_matrix(themes: Dict[str, Dict[str, float]]) -> pd.DataFrame:
+    """
+    Build the (score columns x themes) weight matrix.
+
+    Args:
+        themes: Theme name -> {score column: weight}
+
+    Returns:
+        DataFrame of weights, zero where a column is not part of a theme
+    """
+    return pd.DataFrame(themes).fillna(0.0)
+
+
+def pack_masks(masks: np.ndarray) -> np.ndarray:
+    """Pack (rows x themes) boolean masks into (themes x bytes) bitsets."""
+    return np.packbits(np.asarray(masks, dtype=bool).T, axis=1)
+
+
+def overlap_counts(packed: np.ndarray) -> np.ndarray:
+    """
+    Count common members for every pair of packed baskets.
+
+    Args:
+        packed: (themes x bytes) bitsets from pack_masks
+
+    Returns:
+        (themes x themes) matrix of intersection sizes; the diagonal holds
+        each basket's size
+    """
+    n = len(packed)
+    counts = np.empty((n, n), dtype=np.int64)
+    for i in range(n):
+        counts[i] = POPCOUNT[packed[i] & packed].sum(axis=1)
+    return counts
+
+
+class MultiThemeScreen:
+    """
+    Screen every theme at once and compare the resulting baskets.
+
+    All theme scores come from one matrix product of the score columns with
+    the theme weight matrix; each theme's top-percentile basket is a column
+    of a boolean mask, and overlaps are popcounts of ANDed packed bitsets.
+    """
+
+    def __init__(self, df: pd.DataFrame, themes: Dict[str, Dict[str, float]],
+                 composition: Optional[CompositionEngine] = None):
+        self.df = df
+        self.weights = theme_weight_matrix(themes)
+        values = df[self.weights.index.tolist()].to_numpy(dtype=float)
+        self.scores = pd.DataFrame(
+            np.nan_to_num(values) @ self.weights.to_numpy(),
+            index=df.index, columns=self.weights.columns
+        )
+        self.composition = composition
+
+    @property
+    def themes(self) -> List[str]:
+        return self.weights.columns.tolist()
+
+    def select(self, percentile: float) -> Tuple[np.ndarray, pd.Series]:
+        """
+        Select each theme's top-percentile basket.
+
+        Args:
+            percentile: Top percentile to keep (e.g. 20 keeps the top 20%)
+
+        Returns:
+            Tuple of (boolean array of shape (rows, themes), score threshold
+            of each theme)
+        """
+        scores = self.scores.to_numpy()
+        thresholds = np.quantile(scores, 1 - percentile / 100, axis=0)
+        return scores >= thresholds, pd.Series(thresholds, index=self.themes)
+
+    def overlap(self, masks: np.ndarray) -> Dict[str, pd.DataFrame]:
+        """
+        Theme x theme overlap of the selected baskets.
+
+        Returns:
+            Dictionary with 'counts' (common members), 'jaccard'
+            (intersection over union) and 'share' (share of the row theme's
+            basket also in the column theme's basket)
+        """
+        counts = overlap_counts(pack_masks(masks))
+        sizes = np.diag(counts).astype(float)
+        union = sizes[:, None] + sizes[None, :] - counts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            jaccard = np.where(union > 0, counts / union, 0.0)
+            share = np.where(sizes[:, None] > 0, counts / sizes[:, None], 0.0)
+        return {
+            name: pd.DataFrame(values, index=self.themes, columns=self.themes)
+            for name, values in (('counts', counts), ('jaccard', jaccard), ('share', share))
+        }
+
+    def composition_by_theme(self, dim: str, masks: np.ndarray, normalize: bool = True) -> pd.DataFrame:
+        """
+        Composition of every theme's basket along one dimension.
+
+        Args:
+            dim: Categorical column (must be encoded in the composition engine)
+            masks: Boolean array of shape (rows, themes) from select
+            normalize: Return percentages of each basket instead of counts
+
+        Returns:
+            DataFrame indexed by category with one column per theme
+        """
+        counts = self.composition.counts_matrix(dim, masks, self.themes)
+        if normalize:
+            counts = counts / counts.sum(axis=0).replace(0, 1) * 100
+        return counts
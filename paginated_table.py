@@ -0,0 +1,88 @@
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def score_order(scores: pd.Series, ascending: bool = False) -> np.ndarray:
+    """
+    Row positions ordered by score (stable, NaNs last).
+
+    Args:
+        scores: Score column of the table to paginate
+        ascending: Sort direction (default: best score first)
+
+    Returns:
+        Array of integer row positions
+    """
+    values = scores.to_numpy(dtype=float)
+    keys = values if ascending else -values
+    keys = np.where(np.isnan(keys), np.inf, keys)
+    return np.argsort(keys, kind='stable')
+
+
+def paginated_table(df: pd.DataFrame, order: Optional[np.ndarray] = None,
+                    columns: Optional[List[str]] = None, page_size: int = 50,
+                    key: str = 'table', formats: Optional[Dict[str, str]] = None,
+                    gradient: Optional[str] = None, cmap: str = 'Blues') -> pd.DataFrame:
+    """
+    Render one page of a table, materialising and styling only that page.
+
+    The total row count and page navigation only need ``len(order)``, and
+    the Styler only sees the visible rows. The gradient is anchored to the
+    full column's range so colours stay comparable across pages.
+
+    Args:
+        df: Table to display
+        order: Row positions in display order (default: existing row order)
+        columns: Columns to display (default: all)
+        page_size: Default number of rows per page
+        key: Unique widget key prefix
+        formats: Column -> format string passed to Styler.format
+        gradient: Column to shade with a background gradient
+        cmap: Colormap for the gradient
+
+    Returns:
+        The page that was displayed
+    """
+    total = len(df) if order is None else len(order)
+    columns = columns or df.columns.tolist()
+
+    nav_col1, nav_col2, nav_col3 = st.columns([1, 1, 2])
+    with nav_col1:
+        page_size = st.selectbox(
+            "Rows per page",
+            options=sorted({25, 50, 100, 250, page_size}),
+            index=sorted({25, 50, 100, 250, page_size}).index(page_size),
+            key=f"{key}_page_size"
+        )
+    n_pages = max(math.ceil(total / page_size), 1)
+    with nav_col2:
+        page = st.number_input(
+            "Page",
+            min_value=1,
+            max_value=n_pages,
+            value=1,
+            step=1,
+            key=f"{key}_page"
+        )
+    start = (int(page) - 1) * page_size
+    stop = min(start + page_size, total)
+    with nav_col3:
+        st.caption(f"Rows {start + 1 if total else 0}-{stop} of {total} (page {int(page)} of {n_pages})")
+
+    positions = np.arange(start, stop) if order is None else order[start:stop]
+    page_df = df.iloc[positions][columns]
+
+    styler = page_df.style
+    if formats:
+        styler = styler.format({col: fmt for col, fmt in formats.items() if col in page_df.columns})
+    if gradient and gradient in page_df.columns:
+        styler = styler.background_gradient(
+            subset=[gradient], cmap=cmap,
+            vmin=df[gradient].min(), vmax=df[gradient].max()
+        )
+    st.dataframe(styler)
+    return page_df
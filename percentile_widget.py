@@ -1,54 +1,130 @@
-from ipywidgets import FloatSlider, VBox, Output
-import plotly.express as px
+import threading
+
+from ipywidgets import FloatSlider, HTML, VBox, Output
+from IPython.display import display
+import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
+
+
+class PercentileWidget:
+    """
+    Handle for the percentile slider, its sector pie and basket preview.
+
+    The score ordering and sector codes are computed once, so moving the
+    slider only needs a binary search for the threshold and one bincount.
+    Slider events are debounced: only the latest value is rendered once the
+    slider has been still for ``debounce`` seconds, and stale updates are
+    dropped. The pie chart is updated in place.
+    """
+
+    def __init__(self, df, score_col='Composite_Score', sector_col='sector',
+                 debounce=0.15, preview_rows=50):
+        self.df = df
+        self.debounce = debounce
+        self.preview_rows = preview_rows
+
+        scores = df[score_col].to_numpy(dtype=float)
+        valid = ~np.isnan(scores)
+        # Best score first; ties keep their original order
+        self.order = np.flatnonzero(valid)[np.argsort(-scores[valid], kind='stable')]
+        self.sorted_scores = np.sort(scores[valid])
+        self.sector_codes, self.sector_labels = pd.factorize(df[sector_col])
+
+        self.slider = FloatSlider(
+            value=50,
+            min=0,
+            max=100,
+            step=1,
+            description='Percentile Threshold:',
+            style={'description_width': 'initial'}
+        )
+        self.summary = HTML()
+        self.figure = go.FigureWidget(go.Pie(labels=[], values=[]))
+        self.table = Output()
+        self.widget = VBox([self.slider, self.summary, self.figure, self.table])
+
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._timer = None
+        self._generation = 0
+        self.percentile = None
+        self.threshold = None
+        self.n_selected = 0
+
+        self.slider.observe(self._on_change, names='value')
+        self.update(self.slider.value)
+
+    def _on_change(self, change):
+        # Restart the debounce timer; only the most recent value survives
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._fire, args=(generation, change['new']))
+            self._timer.start()
+
+    def _fire(self, generation, percentile):
+        # Renders are serialised; a newer slider value makes this one stale,
+        # even if it arrived while an older render was still running
+        with self._render_lock:
+            with self._lock:
+                if generation != self._generation:
+                    return
+            self.update(percentile)
+
+    def threshold_for(self, percentile):
+        """Score at the given percentile (same interpolation as Series.quantile)."""
+        n = len(self.sorted_scores)
+        if n == 0:
+            return np.nan
+        position = percentile / 100 * (n - 1)
+        lo = int(np.floor(position))
+        hi = min(lo + 1, n - 1)
+        return self.sorted_scores[lo] + (self.sorted_scores[hi] - self.sorted_scores[lo]) * (position - lo)
+
+    def update(self, percentile):
+        """Recompute the basket for a percentile and refresh the views in place."""
+        self.percentile = percentile
+        self.threshold = self.threshold_for(percentile)
+        self.n_selected = len(self.sorted_scores) - int(
+            np.searchsorted(self.sorted_scores, self.threshold, side='left')
+        )
+        basket = self.order[:self.n_selected]
+
+        codes = self.sector_codes[basket]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.sector_labels))
+        shown = np.flatnonzero(counts)
+
+        self.summary.value = f"Number of companies above {percentile}th percentile: <b>{self.n_selected}</b>"
+        with self.figure.batch_update():
+            self.figure.data[0].labels = self.sector_labels[shown].tolist()
+            self.figure.data[0].values = counts[shown].tolist()
+            self.figure.layout.title = f'Sector Composition (Companies above {percentile}th percentile)'
+
+        # Replace the outputs trait directly: clear_output does not reset it and
+        # goes through the Output context manager, which is unsafe off the
+        # kernel thread (debounced renders run on a Timer thread)
+        self.table.outputs = ()
+        self.table.append_display_data(self.df.iloc[basket[:self.preview_rows]])
+
+    @property
+    def selection(self):
+        """Companies currently above the threshold, best score first."""
+        return self.df.iloc[self.order[:self.n_selected]]
+
+    def _ipython_display_(self):
+        display(self.widget)
+
 
 def create_percentile_widget(df):
-    # Create output widget for displaying results
-    percentile_output = Output()
-    
-    # Create percentile slider
-    percentile_slider = FloatSlider(
-        value=50,
-        min=0,
-        max=100,
-        step=1,
-        description='Percentile Threshold:',
-        style={'description_width': 'initial'}
-    )
-    
-    def on_percentile_change(change):
-        with percentile_output:
-            percentile_output.clear_output()
-            
-            # Calculate threshold value
-            threshold = df['Composite_Score'].quantile(change['new'] / 100)
-            
-            # Filter dataframe
-            global df_sl
-            df_sl = df[df['Composite_Score'] >= threshold].copy()
-            
-            # Display number of companies
-            print(f"Number of companies above {change['new']}th percentile: {len(df_sl)}")
-            
-            # Create sector composition pie chart
-            sector_counts = df_sl['sector'].value_counts()
-            fig = px.pie(values=sector_counts.values, 
-                        names=sector_counts.index,
-                        title=f'Sector Composition (Companies above {change["new"]}th percentile)')
-            fig.show()
-            
-            # Display filtered dataframe
-            print("\nFiltered Companies:")
-            display(df_sl)
-    
-    # Link the slider to the update function
-    percentile_slider.observe(on_percentile_change, names='value')
-    
-    # Display widgets
-    display(percentile_slider)
-    display(percentile_output)
-    
-    # Trigger initial update
-    on_percentile_change({'new': percentile_slider.value})
-    
-    return df_sl 
\ No newline at end of file
+    """
+    Display a percentile slider over df['Composite_Score'] with a sector pie.
+
+    Returns:
+        PercentileWidget handle; ``handle.selection`` is the current basket
+    """
+    handle = PercentileWidget(df)
+    display(handle)
+    return handle
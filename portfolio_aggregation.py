@@ -0,0 +1,125 @@
+import re
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Column names that hold a market capitalisation; a bare 'cap' would also
+# match capex, capacity or capital columns
+MARKET_CAP_PATTERN = re.compile(r'\b(market|mkt) ?(cap|capitali[sz]ation|value)\b|\bmcap\b',
+                                re.IGNORECASE)
+
+
+class PortfolioWeights:
+    """
+    One or many portfolios as a sparse (portfolios x IDs) weight matrix.
+
+    Portfolios are added one at a time with equal, market-cap, score or
+    custom weights; the matrix is built over the union of their IDs. Weights
+    do not need to sum to one because aggregation renormalises them over the
+    IDs with data on each date.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: List[np.ndarray] = []
+        self._weights: List[np.ndarray] = []
+        self._matrix = None
+        self._columns = None
+
+    def add(self, name: str, ids: Sequence, weights: Optional[Sequence[float]] = None) -> 'PortfolioWeights':
+        """
+        Add a portfolio.
+
+        Args:
+            name: Portfolio name (used as the output column)
+            ids: Constituent IDs
+            weights: Weights aligned with ids (default: equal weights);
+                missing or negative weights are treated as zero
+
+        Returns:
+            self, so calls can be chained
+        """
+        ids = np.asarray(ids, dtype=object)
+        w = np.ones(len(ids)) if weights is None else np.asarray(weights, dtype=float)
+        w = np.clip(np.nan_to_num(w), 0, None)
+        self.names.append(name)
+        self._ids.append(ids[w > 0])
+        self._weights.append(w[w > 0])
+        self._matrix = None
+        return self
+
+    def _build(self) -> None:
+        all_ids = np.concatenate(self._ids) if self._ids else np.array([], dtype=object)
+        codes, columns = pd.factorize(all_ids)
+        rows = np.repeat(np.arange(len(self.names)), [len(ids) for ids in self._ids])
+        data = np.concatenate(self._weights) if self._weights else np.array([])
+        # Duplicate IDs within a portfolio are summed by the COO -> CSR conversion
+        self._matrix = sparse.coo_matrix(
+            (data, (rows, codes)), shape=(len(self.names), len(columns))
+        ).tocsr()
+        self._columns = pd.Index(columns)
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        if self._matrix is None:
+            self._build()
+        return self._matrix
+
+    @property
+    def ids(self) -> pd.Index:
+        if self._matrix is None:
+            self._build()
+        return self._columns
+
+
+def aggregate_panel(panel: pd.DataFrame, weights: PortfolioWeights) -> pd.DataFrame:
+    """
+    Weighted average of a date x ID panel for every portfolio at once.
+
+    Only the columns held by at least one portfolio are read from the panel.
+    Weights are renormalised on each date over the IDs that have data, so a
+    missing value never drags a portfolio towards zero.
+
+    Args:
+        panel: Date x ID panel (returns or a fundamental item)
+        weights: Portfolio weight matrix
+
+    Returns:
+        Date x portfolio DataFrame (NaN where a portfolio has no data)
+    """
+    positions = panel.columns.get_indexer(weights.ids)
+    found = positions >= 0
+    w = weights.matrix[:, np.flatnonzero(found)]
+    values = panel.iloc[:, positions[found]].to_numpy(dtype=float)
+    available = ~np.isnan(values)
+
+    totals = np.asarray(w @ np.nan_to_num(values).T).T
+    weight_sums = np.asarray(w @ available.T.astype(float)).T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(weight_sums > 0, totals / weight_sums, np.nan)
+    return pd.DataFrame(result, index=panel.index, columns=weights.names)
+
+
+def basket_weights(df: pd.DataFrame, schemes: dict, id_col: str = 'ID') -> PortfolioWeights:
+    """
+    Build one portfolio per weighting scheme for the same basket.
+
+    Args:
+        df: Basket rows
+        schemes: Portfolio name -> weight column in df, or None for equal weights
+        id_col: Column holding the IDs
+
+    Returns:
+        PortfolioWeights with one portfolio per scheme
+    """
+    weights = PortfolioWeights()
+    for name, column in schemes.items():
+        weights.add(name, df[id_col], None if column is None else df[column])
+    return weights
+
+
+def market_cap_columns(columns: Sequence[str]) -> List[str]:
+    """Columns whose name marks them as a market capitalisation."""
+    return [col for col in columns if MARKET_CAP_PATTERN.search(str(col).replace('_', ' '))]
@@ -0,0 +1,224 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from portfolio_aggregation import PortfolioWeights, aggregate_panel
+
+TRADING_DAYS = 252
+
+
+class CovarianceEstimate:
+    """
+    Shrunk covariance of a universe over one date window, kept in factored form.
+
+    The Ledoit-Wolf covariance ``(1 - delta) X'X / t + delta * mu * I`` is never
+    formed: a basket's variance is ``(1 - delta) ||Xw||^2 / t + delta * mu * ||w||^2``,
+    so only the demeaned window of returns (observations x assets, stored as
+    float32 to halve its footprint), each asset's covariance with the
+    benchmark and the benchmark variance are kept.
+    """
+
+    def __init__(self, returns: pd.DataFrame, benchmark: pd.Series):
+        self.ids = returns.columns
+        self.position = pd.Series(np.arange(len(self.ids)), index=self.ids)
+        values = returns.to_numpy(dtype=float)
+        x = np.nan_to_num(values - np.nanmean(values, axis=0))
+        b = benchmark.to_numpy(dtype=float)
+        b = np.nan_to_num(b - np.nanmean(b))
+        self.n_obs = len(x)
+        # The estimates themselves are computed in float64
+        self.mu, self.shrinkage = ledoit_wolf(x)
+        self.benchmark_cov = x.T @ b / max(self.n_obs, 1)
+        self.benchmark_var = float(b @ b / max(self.n_obs, 1))
+        self.x = x.astype(np.float32)
+
+    def weights(self, ids: Sequence, weights: Optional[Sequence[float]] = None) -> np.ndarray:
+        """
+        Dense weight vector over the universe, renormalised to sum to 1.
+
+        Missing or negative weights are treated as zero, as in PortfolioWeights.
+        """
+        ids = pd.Index(ids)
+        known = ids.isin(self.ids)
+        w = np.ones(len(ids)) if weights is None else np.asarray(weights, dtype=float)
+        w = np.clip(np.nan_to_num(w), 0, None)
+        dense = np.zeros(len(self.ids))
+        np.add.at(dense, self.position[ids[known]].to_numpy(), w[known])
+        total = dense.sum()
+        return dense / total if total else dense
+
+    def variance(self, w: np.ndarray) -> float:
+        """Shrunk variance ``w' Sigma w`` of a weight vector over the universe."""
+        if not self.n_obs:
+            return 0.0
+        xw = (self.x @ w.astype(np.float32)).astype(float)
+        return float((1 - self.shrinkage) * (xw @ xw) / self.n_obs + self.shrinkage * self.mu * (w @ w))
+
+
+def ledoit_wolf(x: np.ndarray):
+    """
+    Ledoit-Wolf shrinkage intensity towards a scaled identity.
+
+    Only Frobenius norms and the trace of the sample covariance are needed,
+    and ``||X'X||_F == ||XX'||_F``, so the smaller of the observations x
+    observations Gram matrix and the assets x assets cross-product is formed.
+
+    Args:
+        x: Demeaned returns matrix (observations x assets, no NaNs)
+
+    Returns:
+        Tuple of (target variance mu, shrinkage intensity in [0, 1])
+    """
+    t, n = x.shape
+    if t == 0 or n == 0:
+        return 0.0, 0.0
+    gram = x @ x.T if t <= n else x.T @ x
+    row_norms = (x ** 2).sum(axis=1)
+    mu = row_norms.sum() / (t * n)
+    sample_norm = (gram ** 2).sum() / t ** 2
+    target_dist = (sample_norm - n * mu ** 2) / n
+    # Sum over observations of ||x_t x_t' - S||^2, without forming x_t x_t'
+    sample_var = ((row_norms ** 2).sum() / t - sample_norm) / (t * n)
+    shrinkage = 0.0 if target_dist <= 0 else float(min(max(sample_var / target_dist, 0.0), 1.0))
+    return float(mu), shrinkage
+
+
+def max_drawdown(returns: np.ndarray) -> float:
+    """Largest peak-to-trough fall of the cumulative return path (negative number)."""
+    wealth = np.cumprod(1 + np.nan_to_num(returns))
+    if not len(wealth):
+        return 0.0
+    peaks = np.maximum.accumulate(np.concatenate([[1.0], wealth]))[1:]
+    return float((wealth / peaks - 1).min())
+
+
+def rolling_risk(portfolio: pd.Series, benchmark: pd.Series, window: int) -> pd.DataFrame:
+    """
+    Rolling volatility, beta and tracking error from running sums.
+
+    Each window is updated from the previous one by adding the newest and
+    dropping the oldest observation (prefix sums), so all windows cost O(T)
+    instead of O(T x window).
+
+    Args:
+        portfolio: Daily portfolio returns
+        benchmark: Daily benchmark returns on the same dates
+        window: Window length in observations
+
+    Returns:
+        DataFrame indexed by date with annualised 'Volatility', 'Beta' and
+        'Tracking Error' (NaN until the first full window)
+    """
+    p = np.nan_to_num(portfolio.to_numpy(dtype=float))
+    b = np.nan_to_num(benchmark.to_numpy(dtype=float))
+    a = p - b
+
+    def window_sums(values):
+        prefix = np.concatenate([[0.0], np.cumsum(values)])
+        return prefix[window:] - prefix[:-window]
+
+    n = float(window)
+    sum_p, sum_b, sum_a = window_sums(p), window_sums(b), window_sums(a)
+    var_p = (window_sums(p * p) - sum_p ** 2 / n) / (n - 1)
+    var_b = (window_sums(b * b) - sum_b ** 2 / n) / (n - 1)
+    var_a = (window_sums(a * a) - sum_a ** 2 / n) / (n - 1)
+    cov_pb = (window_sums(p * b) - sum_p * sum_b / n) / (n - 1)
+
+    pad = np.full(min(window - 1, len(p)), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = np.where(var_b > 0, cov_pb / var_b, np.nan)
+    return pd.DataFrame({
+        'Volatility': np.concatenate([pad, np.sqrt(np.clip(var_p, 0, None) * TRADING_DAYS)]),
+        'Beta': np.concatenate([pad, beta]),
+        'Tracking Error': np.concatenate([pad, np.sqrt(np.clip(var_a, 0, None) * TRADING_DAYS)]),
+    }, index=portfolio.index)
+
+
+class RiskEngine:
+    """
+    Basket risk analytics against the benchmark with cached covariance.
+
+    Covariance estimates are cached per date window (least recently used
+    windows are dropped), so changing the basket or its weights only costs a
+    few matrix-vector products on the cached window of returns.
+    """
+
+    def __init__(self, returns: pd.DataFrame, benchmark: pd.Series,
+                 universe: Optional[Sequence] = None, max_windows: int = 4):
+        if universe is not None:
+            returns = returns[pd.Index(universe).intersection(returns.columns)]
+        self.returns = returns
+        self.benchmark = benchmark.reindex(returns.index)
+        self.max_windows = max_windows
+        self._cache: 'OrderedDict[tuple, CovarianceEstimate]' = OrderedDict()
+
+    def covariance(self, start, end) -> CovarianceEstimate:
+        """Return the (cached) covariance estimate for the [start, end] window."""
+        key = (pd.Timestamp(start), pd.Timestamp(end))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        estimate = CovarianceEstimate(self.returns.loc[key[0]:key[1]],
+                                      self.benchmark.loc[key[0]:key[1]])
+        self._cache[key] = estimate
+        if len(self._cache) > self.max_windows:
+            self._cache.popitem(last=False)
+        return estimate
+
+    def portfolio_returns(self, ids: Sequence, start, end, weights: Optional[Sequence[float]] = None) -> pd.Series:
+        """Daily basket returns, renormalising weights over IDs with data each day."""
+        weights = PortfolioWeights().add('Portfolio', ids, weights)
+        return aggregate_panel(self.returns.loc[start:end], weights)['Portfolio']
+
+    def metrics(self, ids: Sequence, start, end, weights: Optional[Sequence[float]] = None) -> Dict[str, float]:
+        """
+        Realised and ex-ante risk of a basket against the benchmark.
+
+        Args:
+            ids: Basket IDs
+            start: Window start date
+            end: Window end date
+            weights: Optional weights aligned with ids (default: equal weights)
+
+        Returns:
+            Dictionary of annualised volatility, beta, tracking error and
+            max drawdown (realised), plus ex-ante volatility, beta and
+            tracking error from the cached covariance estimate
+        """
+        portfolio = self.portfolio_returns(ids, start, end, weights)
+        benchmark = self.benchmark.loc[start:end]
+        p = portfolio.to_numpy(dtype=float)
+        b = benchmark.to_numpy(dtype=float)
+        valid = ~(np.isnan(p) | np.isnan(b))
+        p, b = p[valid], b[valid]
+
+        realised = {'Volatility': np.nan, 'Beta': np.nan, 'Tracking Error': np.nan}
+        if len(p) > 1:
+            cov_pb = np.cov(p, b)
+            realised = {
+                'Volatility': float(np.sqrt(cov_pb[0, 0] * TRADING_DAYS)),
+                'Beta': float(cov_pb[0, 1] / cov_pb[1, 1]) if cov_pb[1, 1] > 0 else np.nan,
+                'Tracking Error': float(np.std(p - b, ddof=1) * np.sqrt(TRADING_DAYS)),
+            }
+
+        estimate = self.covariance(start, end)
+        w = estimate.weights(ids, weights)
+        port_var = estimate.variance(w)
+        port_bench_cov = float(w @ estimate.benchmark_cov)
+        active_var = port_var - 2 * port_bench_cov + estimate.benchmark_var
+        return {
+            **realised,
+            'Max Drawdown': max_drawdown(portfolio.to_numpy(dtype=float)),
+            'Ex-ante Volatility': float(np.sqrt(max(port_var, 0.0) * TRADING_DAYS)),
+            'Ex-ante Beta': port_bench_cov / estimate.benchmark_var if estimate.benchmark_var > 0 else np.nan,
+            'Ex-ante Tracking Error': float(np.sqrt(max(active_var, 0.0) * TRADING_DAYS)),
+            'Shrinkage': estimate.shrinkage,
+        }
+
+    def rolling(self, ids: Sequence, start, end, window: int = 63,
+                weights: Optional[Sequence[float]] = None) -> pd.DataFrame:
+        """Rolling realised risk of a basket (see ``rolling_risk``)."""
+        portfolio = self.portfolio_returns(ids, start, end, weights)
+        return rolling_risk(portfolio, self.benchmark.loc[start:end], window)
@@ -0,0 +1,93 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Bump whenever the structure of the snapshot state (or of any object stored
+# in it) changes, so stale snapshots are rebuilt instead of unpickled
+SNAPSHOT_VERSION = 3
+SNAPSHOT_PATH = 'app_snapshot.pkl'
+
+# Sessions share the snapshot file, so saves from concurrent reruns are serialised
+_SAVE_LOCK = threading.Lock()
+
+
+class StartupTimer:
+    """Wall-clock timings of the named steps of one script run."""
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = time.perf_counter() if start is None else start
+        self._last = self.start
+        self.steps: List[Tuple[str, float]] = []
+
+    def mark(self, step: str) -> None:
+        """Record the time spent since the previous mark under ``step``."""
+        now = time.perf_counter()
+        self.steps.append((step, now - self._last))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return self._last - self.start
+
+    def report(self) -> 'pd.DataFrame':
+        """Per-step timings plus a 'total' row, in seconds."""
+        # Imported here so the timer itself can run before pandas is loaded
+        import pandas as pd
+        rows = self.steps + [('total', self.total)]
+        return pd.DataFrame(rows, columns=['step', 'seconds']).set_index('step')
+
+
+def load_snapshot(key: Any, path: str = SNAPSHOT_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Restore preprocessed state saved by ``save_snapshot``.
+
+    Args:
+        key: Fingerprint of the inputs the state was built from
+        path: Snapshot file
+
+    Returns:
+        The saved state, or None when the file is missing, unreadable, from
+        another snapshot version or built from different inputs
+    """
+    try:
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get('version') != SNAPSHOT_VERSION or payload.get('key') != key:
+        return None
+    return payload['state']
+
+
+def save_snapshot(key: Any, state: Dict[str, Any], path: str = SNAPSHOT_PATH) -> None:
+    """
+    Save preprocessed state for the next cold start.
+
+    The file is written under a unique temporary name and renamed into place,
+    so an interrupted or concurrent save never leaves a partial snapshot.
+
+    Args:
+        key: Fingerprint of the inputs the state was built from
+        state: Picklable state to save
+        path: Snapshot file
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    with _SAVE_LOCK:
+        f = tempfile.NamedTemporaryFile(dir=directory, prefix=f'{name}.', suffix='.tmp', delete=False)
+        try:
+            with f:
+                pickle.dump({'version': SNAPSHOT_VERSION, 'key': key, 'state': state},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, path)
+        except BaseException:
+            if os.path.exists(f.name):
+                os.unlink(f.name)
+            raise
@@ -6,10 +6,42 @@ import numpy as np
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+from call_analysis import AnalysisStore, BatchCallAnalysis
+from composition import CompositionEngine
+from multi_theme import MultiThemeScreen
+from paginated_table import paginated_table
 
 # Load environment variables
 load_dotenv()
 
+CALL_ANALYSIS_PROMPT = "You are a financial analyst. Analyze the following conference call transcript and provide key insights about the company's performance, challenges, and future outlook."
+
+def analyze_conference_call(call_text):
+    """Send a single conference call transcript to the AI service"""
+    return AI.get_surface_chat_completion([
+        {"promptRole": "system", "prompt": CALL_ANALYSIS_PROMPT},
+        {"promptRole": "user", "prompt": call_text}
+    ])['chatCompletion']['chatCompletionContent']
+
+@st.cache_resource
+def get_analysis_store():
+    """Shared on-disk store of completed conference call analyses"""
+    return AnalysisStore('call_analyses.jsonl')
+
+@st.cache_resource(max_entries=1)
+def get_composition_engine(file_id, _df):
+    """Sector and country encodings of one uploaded file"""
+    return CompositionEngine(_df, ['Sector', 'Country'])
+
+@st.cache_resource(max_entries=4)
+def get_theme_screen(file_id, themes, _df):
+    """Per-theme scores of one uploaded file; each theme is a single score column"""
+    return MultiThemeScreen(
+        _df,
+        {col: {col: 1.0} for col in themes},
+        get_composition_engine(file_id, _df)
+    )
+
 # Set page config
 st.set_page_config(
     page_title="Theme Investment Screener",
@@ -33,7 +65,7 @@ if uploaded_file is not None:
     
     # Display the first few rows of the data
     st.subheader("Data Preview")
-    st.dataframe(df.head())
+    paginated_table(df, page_size=25, key="data_preview")
     
     # Sidebar for column selection and weight adjustments
     st.sidebar.header("Score Selection and Weights")
@@ -86,7 +118,13 @@ if uploaded_file is not None:
         
         # Display filtered results
         st.markdown(f"### Companies in Top {percentile}th Percentile")
-        st.dataframe(df_filtered)
+        # df_filtered is already in score order, so pages are contiguous slices
+        paginated_table(
+            df_filtered,
+            key="final_basket",
+            formats={'Weighted_Score': '{:.2f}'},
+            gradient='Weighted_Score'
+        )
         
         # Display score distribution
         st.subheader("Score Distribution")
@@ -134,6 +172,48 @@ if uploaded_file is not None:
             fig_scores.update_layout(title="Score Distribution of Final Basket")
             st.plotly_chart(fig_scores, use_container_width=True)
         
+        # Multi-theme comparison: every selected column screened as its own theme
+        if len(selected_columns) > 1:
+            st.subheader("Multi-Theme Comparison")
+            st.caption(
+                f"Each selected column is screened as its own theme at the top {percentile}th "
+                "percentile; the sidebar weights are not applied in this comparison."
+            )
+            screen = get_theme_screen(uploaded_file.file_id, tuple(selected_columns), df)
+            theme_masks, theme_thresholds = screen.select(percentile)
+            overlap = screen.overlap(theme_masks)
+            
+            st.dataframe(pd.DataFrame({
+                'Companies': np.diag(overlap['counts']),
+                'Threshold': theme_thresholds
+            }, index=screen.themes))
+            
+            overlap_view = st.radio(
+                "Overlap measure",
+                options=['jaccard', 'share', 'counts'],
+                format_func={'jaccard': 'Jaccard (intersection / union)',
+                             'share': 'Share of row theme in column theme',
+                             'counts': 'Common companies'}.get,
+                horizontal=True
+            )
+            fig_overlap = px.imshow(
+                overlap[overlap_view],
+                text_auto='.2f' if overlap_view != 'counts' else True,
+                color_continuous_scale='Blues',
+                title=f"Theme Overlap of Top {percentile}th Percentile Baskets"
+            )
+            st.plotly_chart(fig_overlap, use_container_width=True)
+            
+            composition_dim = st.selectbox(
+                "Compare theme composition by",
+                options=[dim for dim in ['Sector', 'Country'] if dim in screen.composition]
+            )
+            if composition_dim:
+                st.dataframe(
+                    screen.composition_by_theme(composition_dim, theme_masks)
+                    .style.format('{:.1f}%')
+                )
+        
         # Conference Call Analysis
         st.subheader("Conference Call Analysis")
         if 'Conference_Call' in df.columns:
@@ -147,17 +227,58 @@ if uploaded_file is not None:
                     # Get the conference call text
                     call_text = df[df['Company'] == selected_company]['Conference_Call'].iloc[0]
                     
-                    # Use custom AI function to analyze the conference call
+                    # Reuse the stored analysis if this transcript was already analysed
                     try:
-                        analysis = AI.get_surface_chat_completion([
-                            {"promptRole": "system", "prompt": "You are a financial analyst. Analyze the following conference call transcript and provide key insights about the company's performance, challenges, and future outlook."},
-                            {"promptRole": "user", "prompt": call_text}
-                        ])['chatCompletion']['chatCompletionContent']
+                        analysis, _ = get_analysis_store().analyze(
+                            selected_company, call_text, analyze_conference_call
+                        )
                         
                         st.markdown("### Analysis Results")
                         st.write(analysis)
                     except Exception as e:
                         st.error(f"Error analyzing conference call: {str(e)}")
+            
+            # Batch analysis of the whole basket in the background
+            st.markdown("#### Basket Analysis")
+            max_workers = st.number_input(
+                "Concurrent analyses",
+                min_value=1,
+                max_value=16,
+                value=4,
+                help="Maximum number of transcripts sent to the AI service at the same time"
+            )
+            batch_col1, batch_col2 = st.columns(2)
+            with batch_col1:
+                if st.button("Analyze All Conference Calls in Basket"):
+                    previous = st.session_state.get('call_batch')
+                    if previous is not None:
+                        previous.cancel()
+                    calls = (
+                        df_filtered[['Company', 'Conference_Call']]
+                        .dropna()
+                        .drop_duplicates('Company')
+                    )
+                    st.session_state['call_batch'] = BatchCallAnalysis(
+                        list(calls.itertuples(index=False, name=None)),
+                        analyze_conference_call,
+                        get_analysis_store(),
+                        max_workers=int(max_workers)
+                    ).start()
+            
+            batch = st.session_state.get('call_batch')
+            if batch is not None:
+                with batch_col2:
+                    if batch.running and st.button("Cancel Basket Analysis"):
+                        batch.cancel()
+                st.progress(
+                    batch.progress,
+                    text=f"{batch.completed} of {batch.total} analysed "
+                         f"({batch.cached} from cache, {len(batch.errors)} failed, "
+                         f"{batch.skipped} skipped after cancel)"
+                )
+                if batch.running:
+                    st.button("Refresh progress")
+                st.dataframe(batch.to_frame())
         
         # Export functionality
         if st.button("Export Results"):
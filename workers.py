@@ -0,0 +1,38 @@
+import multiprocessing
+import sys
+import threading
+import types
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+# Stand-in main module while worker processes start (see WorkerPool)
+_WORKER_MAIN = types.ModuleType('__main__')
+_MAIN_LOCK = threading.Lock()
+
+
+class WorkerPool(ProcessPoolExecutor):
+    """
+    Process pool whose workers are started by a fork server.
+
+    Forking the multi-threaded Streamlit server directly can deadlock a child
+    on a lock another thread held at fork time, so workers come from a clean
+    fork server instead. Such workers normally re-import the parent's
+    ``__main__``, which under Streamlit is the dashboard script itself; while
+    a worker is being started the main module is swapped for an empty one, so
+    workers only import the modules of the functions they run. Submitted
+    functions must therefore live in importable modules, not in a script.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        super().__init__(max_workers=max_workers,
+                         mp_context=multiprocessing.get_context('forkserver'))
+
+    def submit(self, fn: Callable, /, *args: Any, **kwargs: Any) -> Future:
+        # Worker processes are started on demand from submit
+        with _MAIN_LOCK:
+            main = sys.modules['__main__']
+            sys.modules['__main__'] = _WORKER_MAIN
+            try:
+                return super().submit(fn, *args, **kwargs)
+            finally:
+                sys.modules['__main__'] = main